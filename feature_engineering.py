@@ -1,45 +1,148 @@
 """
 Feature engineering for Suraksha project.
-Reads `data/upi_transactions.csv` (or --in), computes features described in Phase 3, and writes
-`data/upi_features.parquet` and `models/sender_baselines.json` used by the API.
+Reads `data/upi_transactions.parquet` (or --in, Parquet or CSV), computes features described in Phase 3, and writes
+`data/upi_features.parquet` plus the sender baselines used by the API
+(`models/sender_profile.parquet` and `models/known_payees.parquet`).
 
 Usage:
-  python scripts/feature_engineering.py --in data/upi_transactions.csv --out data/upi_features.parquet
+  python scripts/feature_engineering.py --in data/upi_transactions.parquet --out data/upi_features.parquet
 
 Notes:
-- For large CSVs, use --nrows to limit rows during development.
-- This script loads the full CSV into memory. If your data is too large, we can adapt to
+- For large inputs, use --nrows to limit rows during development.
+- This script loads the full dataset into memory. If your data is too large, we can adapt to
   a chunked approach and use a small feature store (Redis/Postgres) for baselines.
 """
 from __future__ import annotations
 import argparse
-import json
 import math
 import os
 from collections import Counter
 
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
+from numba import njit
+
+from utils.geo import haversine_km
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional; fall back to the pandas groupby loop
+    pl = None
+
+# narrow dtypes applied at load time; amount stays float64 so rupee values keep paise precision
+DTYPES = {
+    'sender_lat': 'float32',
+    'sender_lon': 'float32',
+    'is_fraud': 'int8',
+    'sender_vpa': 'category',
+    'receiver_vpa': 'category',
+    'sender_bank': 'category',
+    'receiver_bank': 'category',
+    'transaction_type': 'category',
+}
+
+
+def load_data(path: str, nrows: int | None = None) -> pd.DataFrame:
+    """Read the transactions Parquet/CSV with Polars' multithreaded readers and hand the result to pandas.
+
+    Columns are downcast to `DTYPES` on the way in, which roughly halves the frame's memory footprint.
+    """
+    if path.endswith('.parquet'):
+        if pl is not None:
+            df = pl.read_parquet(path, n_rows=nrows).to_pandas()
+        else:
+            df = pd.read_parquet(path)
+            df = df.head(nrows) if nrows is not None else df
+        return df.astype(DTYPES)
+    if pl is not None:
+        schema = {'timestamp': pl.Datetime('us'), 'sender_lat': pl.Float32, 'sender_lon': pl.Float32, 'is_fraud': pl.Int8}
+        return pl.read_csv(path, n_rows=nrows, schema_overrides=schema).to_pandas().astype(DTYPES)
+    return pd.read_csv(path, nrows=nrows, parse_dates=['timestamp'], dtype=DTYPES)
+
 
+@njit(cache=True)
+def rolling_counts(sender_ids, ts_ns, window_ns, out):
+    """Per-sender count of transactions in the trailing (t - window, t] interval.
 
-def haversine_km(lat1, lon1, lat2, lon2):
-    R = 6371.0
-    phi1 = np.radians(lat1)
-    phi2 = np.radians(lat2)
-    dphi = np.radians(lat2 - lat1)
-    dlambda = np.radians(lon2 - lon1)
-    a = np.sin(dphi / 2.0) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2.0) ** 2
-    return 2 * R * np.arcsin(np.sqrt(a))
+    Rows must be sorted by (sender, timestamp); a single two-pointer pass fills `out`.
+    """
+    left = 0
+    for i in range(sender_ids.shape[0]):
+        while sender_ids[left] != sender_ids[i] or ts_ns[i] - ts_ns[left] >= window_ns:
+            left += 1
+        out[i] = i - left + 1
+    return out
 
 
 def compute_sender_baselines(df: pd.DataFrame):
     """Compute per-sender baseline info: avg amount, home location (mode of rounded coords), known_payees set"""
+    if pl is not None:
+        return _compute_sender_baselines_polars(df)
+    return _compute_sender_baselines_pandas(df)
+
+
+def _compute_sender_baselines_polars(df: pd.DataFrame):
+    """Multithreaded columnar version of the baseline computation using a lazy Polars group_by."""
+    lf = pl.from_pandas(df[['sender_vpa', 'receiver_vpa', 'amount', 'sender_lat', 'sender_lon']]).lazy()
+    profile = lf.group_by('sender_vpa').agg(
+        pl.col('amount').mean().alias('avg_amount'),
+        pl.col('receiver_vpa').unique(maintain_order=True).alias('known_payees'),
+    )
+    # home location = most frequent (lat, lon) pair after rounding to ~100m; ties go to the
+    # pair seen first, same as Counter.most_common
+    home = (
+        lf.with_row_index('row')
+        .select(
+            'sender_vpa',
+            'row',
+            pl.col('sender_lat').cast(pl.Float64).round(3).alias('home_lat'),
+            pl.col('sender_lon').cast(pl.Float64).round(3).alias('home_lon'),
+        )
+        .group_by(['sender_vpa', 'home_lat', 'home_lon'])
+        .agg(pl.len().alias('n'), pl.col('row').min())
+        .sort(['sender_vpa', 'n', 'row'], descending=[False, True, False])
+        .unique(subset='sender_vpa', keep='first', maintain_order=True)
+        .drop('n', 'row')
+    )
+    res = profile.join(home, on='sender_vpa', how='left').collect()
+
+    baselines = {}
+    for sender, avg_amount, payees, home_lat, home_lon in res.select(
+        'sender_vpa', 'avg_amount', 'known_payees', 'home_lat', 'home_lon'
+    ).iter_rows():
+        baselines[sender] = {
+            'avg_amount': float(avg_amount),
+            'home_lat': float(home_lat),
+            'home_lon': float(home_lon),
+            'known_payees': payees,
+        }
+    return baselines
+
+
+def _compute_sender_baselines_pandas(df: pd.DataFrame, n_jobs: int = -1):
+    """Fallback without Polars: hash-partition senders and run the groupby loop in joblib worker processes."""
+    n_parts = os.cpu_count() if n_jobs == -1 else n_jobs
+    if n_parts <= 1:
+        return _baselines_for_partition(df)
+    sender_ids, _ = pd.factorize(df['sender_vpa'])
+    part = sender_ids % n_parts
+    parts = Parallel(n_jobs=n_parts)(
+        delayed(_baselines_for_partition)(df[part == i]) for i in range(n_parts)
+    )
+    baselines = {}
+    for b in parts:
+        baselines.update(b)
+    return baselines
+
+
+def _baselines_for_partition(df: pd.DataFrame):
     baselines = {}
-    grouped = df.groupby('sender_vpa')
+    grouped = df.groupby('sender_vpa', sort=False, observed=True)
     for sender, g in grouped:
         avg_amount = float(g['amount'].mean()) if len(g) > 0 else 0.0
-        # determine most frequent coarse location
-        coords = list(zip(g['sender_lat'].round(3), g['sender_lon'].round(3)))
+        # determine most frequent coarse location (rounded in float64, coords are loaded as float32)
+        coords = list(zip(g['sender_lat'].astype(np.float64).round(3), g['sender_lon'].astype(np.float64).round(3)))
         if coords:
             most_common = Counter(coords).most_common(1)[0][0]
             home_lat, home_lon = float(most_common[0]), float(most_common[1])
@@ -62,36 +165,71 @@ def create_features(df: pd.DataFrame, baselines: dict):
     df['day_of_week'] = df['timestamp'].dt.dayofweek
     df['is_night_transaction'] = df['hour_of_day'].isin([0, 1, 2, 3, 4]).astype(int)
 
-    # sender baseline features
-    df['sender_avg_amount'] = df['sender_vpa'].map(lambda x: baselines.get(x, {}).get('avg_amount', np.nan))
+    # sender baseline features (one lookup table instead of a lambda per row)
+    profile = pd.DataFrame.from_dict(baselines, orient='index', columns=['avg_amount', 'home_lat', 'home_lon'])
+    df['sender_avg_amount'] = df['sender_vpa'].map(profile['avg_amount']).astype(np.float64)
     # amount deviation
     df['amount_deviation'] = (df['amount'] - df['sender_avg_amount']) / (df['sender_avg_amount'] + 1e-9)
 
-    # is_new_receiver
-    df['is_new_receiver'] = df.apply(lambda r: 0 if r['receiver_vpa'] in baselines.get(r['sender_vpa'], {}).get('known_payees', []) else 1, axis=1)
+    # is_new_receiver: hash-join (sender, receiver) pairs against the known payees of every sender
+    known_pairs = pd.MultiIndex.from_tuples(
+        [(s, p) for s, b in baselines.items() for p in b.get('known_payees', [])],
+        names=['sender_vpa', 'receiver_vpa'],
+    )
+    pairs = pd.MultiIndex.from_arrays([df['sender_vpa'], df['receiver_vpa']])
+    df['is_new_receiver'] = (~pairs.isin(known_pairs)).astype('int8')
 
     # location deviation (km)
-    df['sender_home_lat'] = df['sender_vpa'].map(lambda x: baselines.get(x, {}).get('home_lat', np.nan))
-    df['sender_home_lon'] = df['sender_vpa'].map(lambda x: baselines.get(x, {}).get('home_lon', np.nan))
-    df['location_deviation_km'] = haversine_km(df['sender_home_lat'].astype(float), df['sender_home_lon'].astype(float), df['sender_lat'].astype(float), df['sender_lon'].astype(float))
+    df['sender_home_lat'] = df['sender_vpa'].map(profile['home_lat']).astype(np.float32)
+    df['sender_home_lon'] = df['sender_vpa'].map(profile['home_lon']).astype(np.float32)
+    home_lat, home_lon, lat, lon = df[['sender_home_lat', 'sender_home_lon', 'sender_lat', 'sender_lon']].to_numpy(dtype=np.float32).T
+    df['location_deviation_km'] = haversine_km(home_lat, home_lon, lat, lon)
+
+    # behavioral aggregations: per-sender counts in the last 24h and 1h
+    df = df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+    # timestamps are already sorted, so a stable sort on sender gives (sender, timestamp) order
+    sender_ids, _ = pd.factorize(df['sender_vpa'])
+    order = np.argsort(sender_ids, kind='stable')
+    sender_ids = sender_ids[order]
+    ts_ns = df['timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)[order]
+    for col, window in (('sender_trans_count_24h', '24h'), ('sender_trans_count_1h', '1h')):
+        counts = rolling_counts(sender_ids, ts_ns, pd.Timedelta(window).value, np.empty(len(df), dtype=np.int32))
+        scattered = np.empty_like(counts)
+        scattered[order] = counts
+        df[col] = scattered
 
-    # behavioral aggregations: counts in last 24h and 1h (approximate using groupby and rolling with time)
-    df = df.sort_values('timestamp')
-    df.set_index('timestamp', inplace=True)
+    return df
 
-    # compute per-sender rolling counts
-    df['sender_trans_count_24h'] = df.groupby('sender_vpa')['transaction_id'].rolling('24h').count().reset_index(level=0, drop=True)
-    df['sender_trans_count_1h'] = df.groupby('sender_vpa')['transaction_id'].rolling('1h').count().reset_index(level=0, drop=True)
 
-    # reset index
-    df.reset_index(inplace=True)
+def save_features(df: pd.DataFrame, path: str, row_group_size: int = 500_000):
+    """Write features as zstd Parquet, sorted by sender so row groups cluster per-sender history.
 
-    return df
+    Repeated string columns are cast to categoricals so Arrow writes them as dictionary pages.
+    """
+    df = df.sort_values(['sender_vpa', 'timestamp'], kind='stable', ignore_index=True)
+    for c in ('sender_vpa', 'receiver_vpa', 'sender_bank', 'receiver_bank', 'transaction_type'):
+        df[c] = df[c].astype('category')
+    df.to_parquet(path, index=False, engine='pyarrow', compression='zstd',
+                  row_group_size=row_group_size, use_dictionary=True)
+
+
+def save_baselines(baselines: dict, out_dir: str = 'models'):
+    """Persist baselines as two zstd Parquet tables: per-sender profile and (sender, payee) pairs."""
+    os.makedirs(out_dir, exist_ok=True)
+    profile = pd.DataFrame.from_dict(baselines, orient='index', columns=['avg_amount', 'home_lat', 'home_lon'])
+    profile.index.name = 'sender_vpa'
+    profile.reset_index().to_parquet(os.path.join(out_dir, 'sender_profile.parquet'), index=False, compression='zstd')
+    payees = pd.DataFrame(
+        [(s, p) for s, b in baselines.items() for p in b['known_payees']],
+        columns=['sender_vpa', 'receiver_vpa'],
+    ).astype('category')
+    payees.to_parquet(os.path.join(out_dir, 'known_payees.parquet'), index=False, compression='zstd')
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument('--in', dest='infile', required=True, help='Input CSV')
+    parser.add_argument('--in', dest='infile', required=True, help='Input transactions (.parquet or .csv)')
     parser.add_argument('--out', dest='outpath', default='data/upi_features.parquet', help='Output parquet path')
     parser.add_argument('--nrows', type=int, default=None, help='Read only nrows (useful for dev)')
     args = parser.parse_args()
@@ -99,7 +237,7 @@ if __name__ == '__main__':
     os.makedirs(os.path.dirname(args.outpath), exist_ok=True)
 
     print(f"Loading data from {args.infile} ...")
-    df = pd.read_csv(args.infile, nrows=args.nrows, parse_dates=['timestamp'])
+    df = load_data(args.infile, nrows=args.nrows)
     print(f"Loaded {len(df)} rows")
 
     print("Computing sender baselines...")
@@ -109,11 +247,9 @@ if __name__ == '__main__':
     df_feat = create_features(df, baselines)
 
     print(f"Saving features to {args.outpath} ...")
-    df_feat.to_parquet(args.outpath, index=False)
+    save_features(df_feat, args.outpath)
 
     # save baselines for API
-    os.makedirs('models', exist_ok=True)
-    with open('models/sender_baselines.json', 'w') as f:
-        json.dump(baselines, f)
+    save_baselines(baselines)
 
     print('Feature engineering complete.')
@@ -1,46 +1,55 @@
 """
-Generate a realistic synthetic UPI transactions CSV with injected fraud patterns.
-Output: data/upi_transactions.csv
+Generate a realistic synthetic UPI transactions dataset with injected fraud patterns.
+Output: data/upi_transactions.parquet (written as CSV if --out has another extension)
 
 Usage:
-  python scripts/generate_upi_data.py --nrows 1000000 --out data/upi_transactions.csv
+  python scripts/generate_upi_data.py --nrows 1000000 --out data/upi_transactions.parquet
 
 Notes:
-- Streams non-fraud transactions to CSV to keep memory usage low.
+- Streams non-fraud transactions to disk as Arrow record batches to keep memory usage low;
+  with Parquet output each batch becomes one zstd-compressed row group.
 - Builds lightweight per-sender stats while streaming so fraud records can be generated
   based on sender behavior (anomalous amount, new payee, location anomalies, velocity).
 - Fraud ratio defaults to 0.5% (~5k frauds for 1M rows).
 
-This script requires: faker, numpy, geopy (for distance) (or we implement haversine inline).
+This script requires: faker, numpy, pyarrow (Parquet/CSV writers), numba.
 """
 from __future__ import annotations
 import argparse
-import csv
 import math
 import random
-import uuid
-from collections import defaultdict, Counter
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from faker import Faker
+from numba import njit, prange
 
 fake = Faker()
 Faker.seed(42)
 random.seed(42)
 np.random.seed(42)
+rng = np.random.default_rng(42)
 
 # --- helpers ---
 
-def haversine_km(lat1, lon1, lat2, lon2):
-    """Return distance in kilometers between two lat/lon pairs."""
-    R = 6371.0
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2.0) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2.0) ** 2
-    return 2 * R * math.asin(math.sqrt(a))
+def batch_uuids(n: int):
+    """Return n random version-4 UUID strings built from a single NumPy random buffer."""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = raw.tobytes().hex()
+    return [f"{h[i:i+8]}-{h[i+8:i+12]}-{h[i+12:i+16]}-{h[i+16:i+20]}-{h[i+20:i+32]}"
+            for i in range(0, 32 * n, 32)]
+
+
+def uuid_stream(chunk: int = 100_000):
+    """Yield UUID strings forever, refilling the buffer `chunk` at a time."""
+    while True:
+        yield from batch_uuids(chunk)
 
 
 def random_point_near(lat, lon, max_km=50):
@@ -57,50 +66,76 @@ def random_point_near(lat, lon, max_km=50):
     return math.degrees(lat2), math.degrees(lon2)
 
 
+@njit(fastmath=True, parallel=True, cache=True)
+def destination_points(lat, lon, bearing, dist_km, out_lat, out_lon):
+    """Fill out_lat/out_lon with the points dist_km away from (lat, lon) along bearing (radians)."""
+    R = 6371.0
+    for i in prange(lat.shape[0]):
+        phi1 = math.radians(lat[i])
+        d = dist_km[i] / R
+        phi2 = math.asin(math.sin(phi1) * math.cos(d) + math.cos(phi1) * math.sin(d) * math.cos(bearing[i]))
+        lam2 = math.radians(lon[i]) + math.atan2(math.sin(bearing[i]) * math.sin(d) * math.cos(phi1),
+                                                 math.cos(d) - math.sin(phi1) * math.sin(phi2))
+        out_lat[i] = math.degrees(phi2)
+        out_lon[i] = math.degrees(lam2)
+
+
+def random_points_near(lat, lon, max_km=50):
+    """Vectorized random_point_near: one random point within max_km of each (lat, lon) origin."""
+    n = len(lat)
+    bearing = rng.uniform(0.0, 2 * math.pi, n)
+    dist_km = rng.uniform(0.0, max_km, n)
+    out_lat = np.empty(n)
+    out_lon = np.empty(n)
+    destination_points(lat, lon, bearing, dist_km, out_lat, out_lon)
+    return out_lat, out_lon
+
+
 # --- configuration ---
 BANKS = ['HDFC', 'SBI', 'ICICI', 'AXIS', 'PAYTM', 'YESBANK', 'KOTAK']
 VPADOMAINS = ['okbank', 'upi', 'bank', 'pay']
 TRANSACTION_TYPES = ['P2P', 'P2M']
+BANK_NAMES = np.array(BANKS, dtype=object)
+TRANSACTION_TYPE_NAMES = np.array(TRANSACTION_TYPES, dtype=object)
+
+SCHEMA = pa.schema([
+    ('transaction_id', pa.string()),
+    ('timestamp', pa.timestamp('us')),
+    ('sender_vpa', pa.string()),
+    ('receiver_vpa', pa.string()),
+    ('amount', pa.float64()),
+    ('sender_bank', pa.string()),
+    ('receiver_bank', pa.string()),
+    ('sender_lat', pa.float64()),
+    ('sender_lon', pa.float64()),
+    ('transaction_type', pa.string()),
+    ('device_id', pa.string()),
+    ('is_fraud', pa.int8()),
+])
 
 
 def generate_users(num_users: int):
-    """Create a dict of users with home location, primary bank, and typical amount scale."""
-    users = {}
+    """Create users as a struct of arrays: vpa, bank_id, home location, and typical amount scale.
+
+    Each field is a NumPy array indexed by user id, so batch generation can gather
+    per-transaction user attributes with fancy indexing instead of dict lookups.
+    """
     # Rough lat/lon bounding box for India
     min_lat, max_lat = 8.0, 37.0
     min_lon, max_lon = 68.0, 97.0
-    for i in range(num_users):
-        uname = fake.user_name() + str(random.randint(1, 9999))
-        bank = random.choice(BANKS)
-        domain = random.choice(VPADOMAINS)
-        vpa = f"{uname}@{domain}"
-        # Home location somewhere in India
-        lat = random.uniform(min_lat, max_lat)
-        lon = random.uniform(min_lon, max_lon)
-        # Typical transaction amount scale (log-normal mu, sigma)
-        # We'll store a typical median amount per user sampled from a broad distribution
-        typical_median = float(10 ** random.uniform(math.log10(20), math.log10(2000)))
-        users[vpa] = {
-            'vpa': vpa,
-            'bank': bank,
-            'home_lat': lat,
-            'home_lon': lon,
-            'typical_median': typical_median,
-            'preferred_hours': random.choices(range(24), k=6),  # 6 active hours
-            'payees': set(),
-        }
-    return users
-
-
-def sample_amount(user):
-    # Use a log-normal around the user's typical median
-    median = user['typical_median']
-    # convert median to log-space mu, choose sigma small
-    mu = math.log(median)
-    sigma = 0.8
-    amt = np.random.lognormal(mu, sigma)
-    # truncate: min 1, max 200000
-    return float(max(1.0, min(amt, 200000.0)))
+    # dict.fromkeys drops the occasional duplicate VPA while keeping generation order
+    vpas = list(dict.fromkeys(
+        f"{fake.user_name()}{random.randint(1, 9999)}@{random.choice(VPADOMAINS)}" for _ in range(num_users)
+    ))
+    num_users = len(vpas)
+    # Typical transaction amount scale: a median amount per user sampled log-uniformly in [20, 2000]
+    return SimpleNamespace(
+        vpa=np.array(vpas, dtype=object),
+        bank_id=rng.integers(0, len(BANKS), num_users).astype(np.int8),
+        home_lat=rng.uniform(min_lat, max_lat, num_users),  # home location somewhere in India
+        home_lon=rng.uniform(min_lon, max_lon, num_users),
+        typical_median=10 ** rng.uniform(math.log10(20), math.log10(2000), num_users),
+    )
 
 
 def random_timestamp(start_dt: datetime, end_dt: datetime):
@@ -109,106 +144,139 @@ def random_timestamp(start_dt: datetime, end_dt: datetime):
     return start_dt + timedelta(seconds=secs)
 
 
+def random_timestamps_us(start_dt: datetime, end_dt: datetime, n: int):
+    """Vectorized random_timestamp: n timestamps as int64 microseconds since the epoch (naive, like start_dt)."""
+    start_us = (start_dt - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+    span_s = int((end_dt - start_dt).total_seconds())
+    return start_us + rng.integers(0, span_s + 1, n) * 1_000_000
+
+
+# lat/lon rounded to 3 decimals, shifted to non-negative ints and packed into one int64 key
+_LON_SPAN = 360_001
+_COORD_SPAN = 180_001 * _LON_SPAN
+
+
+def coord_keys(lat, lon):
+    """Pack coordinates rounded to 3 decimals (~100m) into int64 keys."""
+    lat_i = np.rint(np.asarray(lat) * 1000).astype(np.int64) + 90_000
+    lon_i = np.rint(np.asarray(lon) * 1000).astype(np.int64) + 180_000
+    return lat_i * _LON_SPAN + lon_i
+
+
+def most_frequent_coords(user_idx, keys):
+    """Return (users, lat, lon): the most frequent packed coordinate of every user in user_idx."""
+    uniq, counts = np.unique(user_idx.astype(np.int64) * _COORD_SPAN + keys, return_counts=True)
+    users, keys = np.divmod(uniq, _COORD_SPAN)
+    # order by user, then by descending count; the first row of each user is its mode
+    order = np.lexsort((-counts, users))
+    users, keys = users[order], keys[order]
+    first = np.r_[True, users[1:] != users[:-1]]
+    users, keys = users[first], keys[first]
+    lat_i, lon_i = np.divmod(keys, _LON_SPAN)
+    return users, (lat_i - 90_000) / 1000.0, (lon_i - 180_000) / 1000.0
+
+
+def open_writer(out_path: str):
+    """Open a record-batch writer for out_path: Parquet for *.parquet, CSV otherwise."""
+    if out_path.endswith('.parquet'):
+        return pq.ParquetWriter(out_path, SCHEMA, compression='zstd')
+    return pacsv.CSVWriter(out_path, SCHEMA)
+
+
 # --- main generator ---
 
 def generate_transactions(out_path: str,
                           nrows: int = 1_000_000,
                           fraud_ratio: float = 0.005,
-                          num_users: int = 100_000):
-    """Stream-generate transactions and write to CSV."
-    """
+                          num_users: int = 100_000,
+                          batch_size: int = 100_000):
+    """Stream-generate transactions and write them to Parquet (or CSV)."""
     n_fraud_target = int(nrows * fraud_ratio)
     n_nonfraud = nrows - n_fraud_target
 
     users = generate_users(num_users)
+    num_users = len(users.vpa)
+    user_bank = BANK_NAMES[users.bank_id]
 
-    # per-sender running stats
-    sender_sum = defaultdict(float)
-    sender_count = defaultdict(int)
-    sender_locations = defaultdict(Counter)
-    sender_payees = defaultdict(set)
+    # per-sender running stats, indexed by user id
+    sender_sum = np.zeros(num_users)
+    sender_count = np.zeros(num_users, dtype=np.int64)
+    loc_users = []
+    loc_keys = []
 
     start_dt = datetime.utcnow() - timedelta(days=180)  # ~6 months
     end_dt = datetime.utcnow()
 
-    fieldnames = [
-        'transaction_id', 'timestamp', 'sender_vpa', 'receiver_vpa', 'amount',
-        'sender_bank', 'receiver_bank', 'sender_lat', 'sender_lon', 'transaction_type',
-        'device_id', 'is_fraud'
-    ]
+    uuids = uuid_stream()
 
     print(f"Streaming {n_nonfraud} non-fraud transactions to {out_path} ...")
 
-    with open(out_path, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    with open_writer(out_path) as writer:
+        # Generate non-fraud transactions in vectorized batches
+        mu = np.log(users.typical_median)
 
-        # Generate non-fraud transactions
-        user_keys = list(users.keys())
-        num_users_local = len(user_keys)
-
-        for i in range(n_nonfraud):
+        for start in range(0, n_nonfraud, batch_size):
+            B = min(batch_size, n_nonfraud - start)
             # sample sender and receiver
-            sender = users[random.randrange(num_users_local)]
-            receiver = users[random.randrange(num_users_local)]
-            # avoid self-pay
-            while receiver['vpa'] == sender['vpa']:
-                receiver = users[random.randrange(num_users_local)]
+            si = rng.integers(0, num_users, B)
+            # avoid self-pay: offset the receiver by 1..num_users-1 from the sender
+            ri = (si + 1 + rng.integers(0, num_users - 1, B)) % num_users
 
-            amount = sample_amount(sender)
-            ts = random_timestamp(start_dt, end_dt)
+            amount = np.round(np.clip(rng.lognormal(mu[si], 0.8), 1.0, 200000.0), 2)
             # sender location near home
-            s_lat, s_lon = random_point_near(sender['home_lat'], sender['home_lon'], max_km=50)
-            txn = {
-                'transaction_id': str(uuid.uuid4()),
-                'timestamp': ts.isoformat(),
-                'sender_vpa': sender['vpa'],
-                'receiver_vpa': receiver['vpa'],
-                'amount': round(amount, 2),
-                'sender_bank': sender['bank'],
-                'receiver_bank': receiver['bank'],
-                'sender_lat': round(s_lat, 6),
-                'sender_lon': round(s_lon, 6),
-                'transaction_type': random.choices(TRANSACTION_TYPES, weights=[0.85, 0.15])[0],
-                'device_id': fake.uuid4(),
-                'is_fraud': 0,
-            }
-            writer.writerow(txn)
+            s_lat, s_lon = random_points_near(users.home_lat[si], users.home_lon[si], max_km=50)
+            s_lat = np.round(s_lat, 6)
+            s_lon = np.round(s_lon, 6)
+            batch = pa.RecordBatch.from_pydict({
+                'transaction_id': batch_uuids(B),
+                'timestamp': pa.array(random_timestamps_us(start_dt, end_dt, B), type=pa.timestamp('us')),
+                'sender_vpa': users.vpa[si].tolist(),
+                'receiver_vpa': users.vpa[ri].tolist(),
+                'amount': amount,
+                'sender_bank': user_bank[si].tolist(),
+                'receiver_bank': user_bank[ri].tolist(),
+                'sender_lat': s_lat,
+                'sender_lon': s_lon,
+                'transaction_type': TRANSACTION_TYPE_NAMES[rng.choice(2, size=B, p=[0.85, 0.15])].tolist(),
+                'device_id': batch_uuids(B),
+                'is_fraud': np.zeros(B, dtype=np.int8),
+            }, schema=SCHEMA)
+            writer.write_batch(batch)
 
             # update running stats
-            s_vpa = sender['vpa']
-            sender_sum[s_vpa] += txn['amount']
-            sender_count[s_vpa] += 1
-            sender_locations[s_vpa][(round(s_lat, 3), round(s_lon, 3))] += 1
-            sender_payees[s_vpa].add(receiver['vpa'])
+            np.add.at(sender_sum, si, amount)
+            sender_count += np.bincount(si, minlength=num_users)
+            loc_users.append(si)
+            loc_keys.append(coord_keys(s_lat, s_lon))
 
-            if (i + 1) % 100000 == 0:
-                print(f"  generated {i+1} / {n_nonfraud} non-fraud txns")
+            print(f"  generated {start + B} / {n_nonfraud} non-fraud txns")
 
         print("Finished non-fraud streaming. Building sender baselines...")
 
         # Build baseline stats
-        sender_avg = {}
-        sender_home = {}
-        for vpa in user_keys:
-            cnt = sender_count.get(vpa, 0)
-            sender_avg[vpa] = (sender_sum[vpa] / cnt) if cnt > 0 else users[vpa]['typical_median']
-            # determine most frequent coarse-loc as "home"
-            loc_counter = sender_locations.get(vpa)
-            if loc_counter and len(loc_counter) > 0:
-                most_common_loc, _ = loc_counter.most_common(1)[0]
-                sender_home[vpa] = (most_common_loc[0], most_common_loc[1])
-            else:
-                sender_home[vpa] = (round(users[vpa]['home_lat'], 3), round(users[vpa]['home_lon'], 3))
+        sender_avg = np.where(sender_count > 0, sender_sum / np.maximum(sender_count, 1), users.typical_median)
+        # most frequent coarse-loc as "home", defaulting to the rounded true home
+        home_lat = np.round(users.home_lat, 3)
+        home_lon = np.round(users.home_lon, 3)
+        if loc_users:
+            seen, mode_lat, mode_lon = most_frequent_coords(np.concatenate(loc_users), np.concatenate(loc_keys))
+            home_lat[seen] = mode_lat
+            home_lon[seen] = mode_lon
 
         # --- Fraud injection ---
         print(f"Injecting {n_fraud_target} fraudulent transactions using multiple patterns...")
         fraud_written = 0
+        fraud_rows = []
 
         # prepare sender list that have some history
-        active_senders = [v for v in user_keys if sender_count.get(v, 0) >= 3]
-        if not active_senders:
-            active_senders = user_keys
+        active_senders = np.flatnonzero(sender_count >= 3)
+        if len(active_senders) == 0:
+            active_senders = np.arange(num_users)
+
+        def sample_pairs(n):
+            """Pre-sample n (sender, receiver) ids for a pattern: active senders, never self-pay."""
+            si = rng.choice(active_senders, n)
+            return si, (si + 1 + rng.integers(0, num_users - 1, n)) % num_users
 
         # pattern allocation (approximate)
         # HV: 25%, AnomAmt: 25%, TimeAnom: 20%, LocationAnom: 20%, NewPayee: 10%
@@ -225,40 +293,38 @@ def generate_transactions(out_path: str,
         print(f"  HV frauds: creating {allocations['hv']} events (as bursts)")
         hv_created = 0
         hv_burst_sizes = [5, 10, 20, 30]
-        while hv_created < allocations['hv']:
-            sender_vpa = random.choice(active_senders)
-            # pick or create a new receiver
-            receiver_vpa = random.choice(user_keys)
-            while receiver_vpa == sender_vpa:
-                receiver_vpa = random.choice(user_keys)
-            # choose burst size
-            burst = random.choice(hv_burst_sizes)
+        # every burst has at least one event, so allocations['hv'] bursts is an upper bound
+        hv_senders, hv_receivers = sample_pairs(allocations['hv'])
+        hv_bursts = rng.choice(hv_burst_sizes, allocations['hv'])
+        for si, ri, burst in zip(hv_senders, hv_receivers, hv_bursts):
+            if hv_created >= allocations['hv']:
+                break
             # pick a start time within last 7 days to simulate velocity
             burst_start = random_timestamp(end_dt - timedelta(days=7), end_dt)
             # small amounts: typically smaller than user's average
-            avg = sender_avg.get(sender_vpa, 200.0)
+            avg = sender_avg[si]
             for j in range(burst):
                 if hv_created >= allocations['hv']:
                     break
                 ts = burst_start + timedelta(seconds=random.randint(0, 3600))
                 amt = max(1.0, round(np.random.lognormal(math.log(max(5, avg*0.05)), 0.5), 2))
-                s_home = sender_home.get(sender_vpa)
+                s_home = (home_lat[si], home_lon[si])
                 s_lat, s_lon = random_point_near(s_home[0], s_home[1], max_km=20)
                 txn = {
-                    'transaction_id': str(uuid.uuid4()),
-                    'timestamp': ts.isoformat(),
-                    'sender_vpa': sender_vpa,
-                    'receiver_vpa': receiver_vpa,
+                    'transaction_id': next(uuids),
+                    'timestamp': ts,
+                    'sender_vpa': users.vpa[si],
+                    'receiver_vpa': users.vpa[ri],
                     'amount': amt,
-                    'sender_bank': users[sender_vpa]['bank'],
-                    'receiver_bank': users[receiver_vpa]['bank'],
+                    'sender_bank': user_bank[si],
+                    'receiver_bank': user_bank[ri],
                     'sender_lat': round(s_lat, 6),
                     'sender_lon': round(s_lon, 6),
                     'transaction_type': 'P2P',
-                    'device_id': fake.uuid4(),
+                    'device_id': next(uuids),
                     'is_fraud': 1,
                 }
-                writer.writerow(txn)
+                fraud_rows.append(txn)
                 hv_created += 1
                 fraud_written += 1
         print(f"    HV created: {hv_created}")
@@ -266,83 +332,72 @@ def generate_transactions(out_path: str,
         # 2) Anomalous Amount: large sudden amounts far above sender average
         print(f"  Anomalous-Amount frauds: {allocations['anom_amt']}")
         anom_created = 0
-        while anom_created < allocations['anom_amt']:
-            sender_vpa = random.choice(active_senders)
-            receiver_vpa = random.choice(user_keys)
-            while receiver_vpa == sender_vpa:
-                receiver_vpa = random.choice(user_keys)
-            avg = sender_avg.get(sender_vpa, 200.0)
+        for si, ri in zip(*sample_pairs(allocations['anom_amt'])):
+            avg = sender_avg[si]
             # create large anomaly: 20x - 200x average (but cap)
             factor = random.uniform(20, 200)
             amt = round(min(avg * factor, 500000.0), 2)
             ts = random_timestamp(start_dt, end_dt)
-            s_home = sender_home.get(sender_vpa)
+            s_home = (home_lat[si], home_lon[si])
             # use usual device but different location sometimes
             s_lat, s_lon = random_point_near(s_home[0], s_home[1], max_km=50)
             txn = {
-                'transaction_id': str(uuid.uuid4()),
-                'timestamp': ts.isoformat(),
-                'sender_vpa': sender_vpa,
-                'receiver_vpa': receiver_vpa,
+                'transaction_id': next(uuids),
+                'timestamp': ts,
+                'sender_vpa': users.vpa[si],
+                'receiver_vpa': users.vpa[ri],
                 'amount': amt,
-                'sender_bank': users[sender_vpa]['bank'],
-                'receiver_bank': users[receiver_vpa]['bank'],
+                'sender_bank': user_bank[si],
+                'receiver_bank': user_bank[ri],
                 'sender_lat': round(s_lat, 6),
                 'sender_lon': round(s_lon, 6),
                 'transaction_type': 'P2P',
-                'device_id': fake.uuid4(),
+                'device_id': next(uuids),
                 'is_fraud': 1,
             }
-            writer.writerow(txn)
+            fraud_rows.append(txn)
             anom_created += 1
             fraud_written += 1
 
         # 3) Time Anomaly: large transactions at odd hours (e.g., 3 AM)
         print(f"  Time-anomaly frauds: {allocations['time']}")
         time_created = 0
-        while time_created < allocations['time']:
-            sender_vpa = random.choice(active_senders)
-            receiver_vpa = random.choice(user_keys)
-            while receiver_vpa == sender_vpa:
-                receiver_vpa = random.choice(user_keys)
-            avg = sender_avg.get(sender_vpa, 200.0)
+        night_hours = rng.integers(0, 5, allocations['time'])
+        for si, ri, hour in zip(*sample_pairs(allocations['time']), night_hours):
+            avg = sender_avg[si]
             amt = round(max(avg * random.uniform(5, 100), 1000.0), 2)
             # pick hour in 0-4
             day = random.randint(0, 180)
             ts_base = end_dt - timedelta(days=day)
-            ts = ts_base.replace(hour=random.choice([0,1,2,3,4]), minute=random.randint(0,59), second=random.randint(0,59))
-            s_home = sender_home.get(sender_vpa)
+            ts = ts_base.replace(hour=int(hour), minute=random.randint(0,59), second=random.randint(0,59))
+            s_home = (home_lat[si], home_lon[si])
             s_lat, s_lon = random_point_near(s_home[0], s_home[1], max_km=100)
             txn = {
-                'transaction_id': str(uuid.uuid4()),
-                'timestamp': ts.isoformat(),
-                'sender_vpa': sender_vpa,
-                'receiver_vpa': receiver_vpa,
+                'transaction_id': next(uuids),
+                'timestamp': ts,
+                'sender_vpa': users.vpa[si],
+                'receiver_vpa': users.vpa[ri],
                 'amount': amt,
-                'sender_bank': users[sender_vpa]['bank'],
-                'receiver_bank': users[receiver_vpa]['bank'],
+                'sender_bank': user_bank[si],
+                'receiver_bank': user_bank[ri],
                 'sender_lat': round(s_lat, 6),
                 'sender_lon': round(s_lon, 6),
                 'transaction_type': 'P2P',
-                'device_id': fake.uuid4(),
+                'device_id': next(uuids),
                 'is_fraud': 1,
             }
-            writer.writerow(txn)
+            fraud_rows.append(txn)
             time_created += 1
             fraud_written += 1
 
         # 4) Location Anomaly: transaction from far away location relative to sender home
         print(f"  Location-anomaly frauds: {allocations['loc']}")
         loc_created = 0
-        while loc_created < allocations['loc']:
-            sender_vpa = random.choice(active_senders)
-            receiver_vpa = random.choice(user_keys)
-            while receiver_vpa == sender_vpa:
-                receiver_vpa = random.choice(user_keys)
-            avg = sender_avg.get(sender_vpa, 200.0)
+        for si, ri in zip(*sample_pairs(allocations['loc'])):
+            avg = sender_avg[si]
             amt = round(max(avg * random.uniform(2, 50), 500.0), 2)
             ts = random_timestamp(start_dt, end_dt)
-            s_home = sender_home.get(sender_vpa)
+            s_home = (home_lat[si], home_lon[si])
             # generate location far away: 500 - 2500 km
             # pick a random direction and large distance
             distance_km = random.uniform(500, 2500)
@@ -351,62 +406,66 @@ def generate_transactions(out_path: str,
             new_lat = s_home[0] + (distance_km / 111.0) * math.cos(bearing)
             new_lon = s_home[1] + (distance_km / (111.0 * math.cos(math.radians(s_home[0])))) * math.sin(bearing)
             txn = {
-                'transaction_id': str(uuid.uuid4()),
-                'timestamp': ts.isoformat(),
-                'sender_vpa': sender_vpa,
-                'receiver_vpa': receiver_vpa,
+                'transaction_id': next(uuids),
+                'timestamp': ts,
+                'sender_vpa': users.vpa[si],
+                'receiver_vpa': users.vpa[ri],
                 'amount': amt,
-                'sender_bank': users[sender_vpa]['bank'],
-                'receiver_bank': users[receiver_vpa]['bank'],
+                'sender_bank': user_bank[si],
+                'receiver_bank': user_bank[ri],
                 'sender_lat': round(new_lat, 6),
                 'sender_lon': round(new_lon, 6),
                 'transaction_type': 'P2P',
-                'device_id': fake.uuid4(),
+                'device_id': next(uuids),
                 'is_fraud': 1,
             }
-            writer.writerow(txn)
+            fraud_rows.append(txn)
             loc_created += 1
             fraud_written += 1
 
         # 5) New Payee: large first-time payment to a brand-new VPA
         print(f"  New-payee frauds: {allocations['new_payee']}")
         np_created = 0
-        while np_created < allocations['new_payee']:
-            sender_vpa = random.choice(active_senders)
+        np_senders = rng.choice(active_senders, allocations['new_payee'])
+        np_domains = rng.choice(VPADOMAINS, allocations['new_payee'])
+        np_banks = BANK_NAMES[rng.integers(0, len(BANKS), allocations['new_payee'])]
+        for si, domain, bank in zip(np_senders, np_domains, np_banks):
             # create brand new payee
-            new_payee_uname = fake.user_name() + str(uuid.uuid4())[:6]
-            new_payee = f"{new_payee_uname}@{random.choice(VPADOMAINS)}"
-            amt = round(max(sender_avg.get(sender_vpa, 200.0) * random.uniform(10, 200), 1000.0), 2)
+            new_payee_uname = fake.user_name() + next(uuids)[:6]
+            new_payee = f"{new_payee_uname}@{domain}"
+            amt = round(max(sender_avg[si] * random.uniform(10, 200), 1000.0), 2)
             ts = random_timestamp(start_dt, end_dt)
-            s_home = sender_home.get(sender_vpa)
+            s_home = (home_lat[si], home_lon[si])
             s_lat, s_lon = random_point_near(s_home[0], s_home[1], max_km=100)
             txn = {
-                'transaction_id': str(uuid.uuid4()),
-                'timestamp': ts.isoformat(),
-                'sender_vpa': sender_vpa,
+                'transaction_id': next(uuids),
+                'timestamp': ts,
+                'sender_vpa': users.vpa[si],
                 'receiver_vpa': new_payee,
                 'amount': amt,
-                'sender_bank': users[sender_vpa]['bank'],
-                'receiver_bank': random.choice(BANKS),
+                'sender_bank': user_bank[si],
+                'receiver_bank': bank,
                 'sender_lat': round(s_lat, 6),
                 'sender_lon': round(s_lon, 6),
                 'transaction_type': 'P2P',
-                'device_id': fake.uuid4(),
+                'device_id': next(uuids),
                 'is_fraud': 1,
             }
-            writer.writerow(txn)
+            fraud_rows.append(txn)
             np_created += 1
             fraud_written += 1
 
+        if fraud_rows:
+            writer.write_batch(pa.RecordBatch.from_pylist(fraud_rows, schema=SCHEMA))
         print(f"Total fraud rows written: {fraud_written} (target {n_fraud_target})")
 
     print(f"Data generation complete. File written to: {out_path}")
 
 
 if __name__ == '__main__':
-    parser = argparse.ArgumentParser(description='Generate synthetic UPI transactions CSV with fraud patterns')
+    parser = argparse.ArgumentParser(description='Generate synthetic UPI transactions with fraud patterns')
     parser.add_argument('--nrows', type=int, default=1000000, help='Total number of transactions to generate')
-    parser.add_argument('--out', type=str, default='data/upi_transactions.csv', help='Output CSV path')
+    parser.add_argument('--out', type=str, default='data/upi_transactions.parquet', help='Output path (.parquet or .csv)')
     parser.add_argument('--users', type=int, default=100000, help='Number of unique users (VPAs)')
     parser.add_argument('--fraud_ratio', type=float, default=0.005, help='Fraction of transactions to mark as fraud')
     args = parser.parse_args()
@@ -0,0 +1,29 @@
+"""
+Gunicorn settings for the Suraksha API.
+
+The app (model, scaler and sender baselines) is loaded once in the master and shared copy-on-write
+with the forked workers; each worker is one single-threaded Uvicorn event loop.
+
+Usage:
+  gunicorn -c gunicorn.conf.py api.main:app
+"""
+import gc
+import multiprocessing
+import os
+
+# one OpenMP (xgboost) and numba (parallel haversine ufunc) thread per worker; set before the preloaded
+# app imports them, otherwise each worker could start cpu_count threads of its own
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('NUMBA_NUM_THREADS', '1')
+
+bind = os.getenv('BIND', '0.0.0.0:8000')
+preload_app = True
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'uvicorn.workers.UvicornWorker'
+threads = 1
+
+
+def pre_fork(server, worker):
+    # move the preloaded objects out of the GC's tracked generations so collections in the
+    # workers do not write to (and un-share) their pages
+    gc.freeze()
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+
+import main
+from main import app
+
+client = TestClient(app)
+
+TX = {
+    'transaction_id': 't1',
+    'timestamp': '2024-03-01T02:15:30.123456',
+    'sender_vpa': 'alice@upi',
+    'receiver_vpa': 'bob@upi',
+    'amount': 2500.0,
+    'sender_bank': 'SBI',
+    'receiver_bank': 'HDFC',
+    'sender_lat': 19.07,
+    'sender_lon': 72.87,
+    'transaction_type': 'P2P',
+    'device_id': 'd1',
+}
+
+
+def time_score(X):
+    # stand-in model whose score encodes the parsed time features: hour_of_day * 10 + day_of_week
+    return X[:, 8] * 10 + X[:, 9]
+
+
+def test_predict_bulk_mixed_timestamp_formats(monkeypatch):
+    monkeypatch.setattr(main, 'score_matrix', time_score)
+    # isoformat() drops the fraction when microsecond == 0, so one batch can mix ISO forms
+    txs = [
+        TX,
+        dict(TX, transaction_id='t2', timestamp='2024-03-02T14:00:00'),
+        dict(TX, transaction_id='t3', timestamp='2024-03-03T23:59:59Z'),
+        dict(TX, transaction_id='t4', timestamp='2024-03-04 08:30:00+05:30'),
+    ]
+    r = client.post('/predict/bulk', json=txs)
+    assert r.status_code == 200
+    bulk = r.json()
+    assert [b['transaction_id'] for b in bulk] == ['t1', 't2', 't3', 't4']
+    for tx, b in zip(txs, bulk):
+        single = client.post('/predict', json=tx).json()
+        assert b['fraud_score'] == single['fraud_score']
+        assert b['is_fraud'] == single['is_fraud']
+    # hour is taken in the timestamp's own offset: Sunday 23h for the Z row, Monday 08h for the +05:30 row
+    assert [b['fraud_score'] for b in bulk] == [24, 145, 236, 80]
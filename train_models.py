@@ -1,12 +1,19 @@
 """
 Training script for RandomForest and XGBoost using the engineered features.
-Saves best model as `models/xgb_model.joblib` and `models/rf_model.joblib`.
+Saves best model as `models/xgb_model.joblib` and `models/rf_model.joblib`. For the API it also writes:
+- `models/xgb_model.ubj` (native XGBoost format) and `models/scaler.npz` (scaler mean/scale and feature names)
+- `models/xgb_model.onnx` for ONNX Runtime inference (requires onnxmltools)
+- `models/xgb_model.so`, the booster compiled with Treelite for single-row scoring (requires treelite, tl2cgen and a C compiler)
 
 Usage:
   python scripts/train_models.py --in data/upi_features.parquet --out models/
+
+Class imbalance is handled with class_weight='balanced' (RandomForest) and scale_pos_weight (XGBoost);
+pass --use-smote to also oversample the training set with SMOTE.
 """
 from __future__ import annotations
 import argparse
+import functools
 import joblib
 import os
 from sklearn.ensemble import RandomForestClassifier
@@ -15,10 +22,25 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report
 
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import xgboost as xgb
-import pandas as pd
 from imblearn.over_sampling import SMOTE
 
+try:
+    from onnxmltools import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+except ImportError:  # onnxmltools is optional; without it the API falls back to the XGBoost booster
+    convert_xgboost = None
+
+try:
+    import tl2cgen
+    import treelite
+except ImportError:  # treelite/tl2cgen are optional; without them no shared library is built
+    tl2cgen = None
+
 
 FEATURE_COLUMNS = [
     'amount', 'sender_avg_amount', 'amount_deviation', 'sender_trans_count_24h', 'sender_trans_count_1h',
@@ -26,16 +48,34 @@ FEATURE_COLUMNS = [
 ]
 
 
-def load_data(path: str):
-    df = pd.read_parquet(path)
-    return df
+def load_data(path: str) -> pa.Table:
+    """Read only the model columns into Arrow and drop incomplete rows with compute kernels (no pandas frame)."""
+    columns = FEATURE_COLUMNS + ['is_fraud']
+    table = pq.read_table(path, columns=columns)
+    # NaN counts as missing, as it does for DataFrame.dropna
+    complete = functools.reduce(pc.and_, (pc.invert(pc.is_null(table[c], nan_is_null=True)) for c in columns))
+    return table.filter(complete)
+
+
+def export_onnx(bst: xgb.Booster, n_features: int, path: str):
+    """Convert the trained booster to ONNX with a single float32 `input` of shape (None, n_features)."""
+    onx = convert_xgboost(bst, initial_types=[('input', FloatTensorType([None, n_features]))])
+    with open(path, 'wb') as f:
+        f.write(onx.SerializeToString())
+
+
+def export_treelite(bst: xgb.Booster, libpath: str):
+    """AOT-compile the booster to a model-specific shared library loadable with `tl2cgen.Predictor`."""
+    model = treelite.frontend.from_xgboost(bst)
+    tl2cgen.export_lib(model, toolchain='gcc', libpath=libpath, params={'parallel_comp': os.cpu_count() or 1, 'quantize': 1})
 
 
-def prepare_X_y(df: pd.DataFrame):
-    df = df.copy()
-    df = df.dropna(subset=FEATURE_COLUMNS + ['is_fraud'])
-    X = df[FEATURE_COLUMNS]
-    y = df['is_fraud']
+def prepare_X_y(table: pa.Table):
+    """Copy the feature columns straight into one C-contiguous float32 matrix, the layout xgb.DMatrix takes as is."""
+    X = np.empty((table.num_rows, len(FEATURE_COLUMNS)), dtype=np.float32)
+    for j, c in enumerate(FEATURE_COLUMNS):
+        X[:, j] = table[c].to_numpy()
+    y = table['is_fraud'].to_numpy()
     return X, y
 
 
@@ -43,12 +83,14 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--in', dest='inpath', required=True)
     parser.add_argument('--out', dest='outdir', default='models')
+    parser.add_argument('--use-smote', action='store_true',
+                        help='Oversample the minority class with SMOTE (slow, inflates the training set)')
     args = parser.parse_args()
 
     os.makedirs(args.outdir, exist_ok=True)
     print(f"Loading features from {args.inpath}...")
-    df = load_data(args.inpath)
-    X, y = prepare_X_y(df)
+    table = load_data(args.inpath)
+    X, y = prepare_X_y(table)
 
     print('Splitting...')
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
@@ -58,10 +100,13 @@ if __name__ == '__main__':
     X_train_s = scaler.fit_transform(X_train)
     X_test_s = scaler.transform(X_test)
 
-    # handle imbalance with SMOTE
-    print('Applying SMOTE to training set...')
-    sm = SMOTE(random_state=42)
-    X_res, y_res = sm.fit_resample(X_train_s, y_train)
+    # class weights already compensate for the imbalance; SMOTE is opt-in
+    if args.use_smote:
+        print('Applying SMOTE to training set...')
+        sm = SMOTE(random_state=42)
+        X_res, y_res = sm.fit_resample(X_train_s, y_train)
+    else:
+        X_res, y_res = X_train_s, y_train
 
     # Random Forest
     print('Training RandomForest (class_weight=balanced)...')
@@ -97,5 +142,14 @@ if __name__ == '__main__':
     print(classification_report(y_test, y_pred_xgb, digits=4))
 
     joblib.dump({'model': bst, 'scaler': scaler, 'features': FEATURE_COLUMNS}, os.path.join(args.outdir, 'xgb_model.joblib'))
+    # native binary model + plain scaler arrays: the API loads these without unpickling sklearn/xgboost objects
+    bst.save_model(os.path.join(args.outdir, 'xgb_model.ubj'))
+    np.savez(os.path.join(args.outdir, 'scaler.npz'), mean=scaler.mean_, scale=scaler.scale_, features=np.array(FEATURE_COLUMNS))
+    if convert_xgboost is not None:
+        print('Exporting XGBoost model to ONNX...')
+        export_onnx(bst, len(FEATURE_COLUMNS), os.path.join(args.outdir, 'xgb_model.onnx'))
+    if tl2cgen is not None:
+        print('Compiling XGBoost model with Treelite...')
+        export_treelite(bst, os.path.join(args.outdir, 'xgb_model.so'))
 
     print('Training complete. Models saved in', args.outdir)
@@ -1,20 +1,26 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database.db import get_db
-from ..database.models import FraudLog, OTPLog, Transaction
+from ..database.models import FraudLog, OTPLog, Transaction, epoch_ms
 
 router = APIRouter()
 
 @router.get("/stats")
-def stats(db: Session = Depends(get_db)):
-    fraud_count = db.query(FraudLog).count()
-    otp_sent = db.query(OTPLog).count()
-    tx_count = db.query(Transaction).count()
+async def stats(db: AsyncSession = Depends(get_db)):
+    # plain COUNT(*) scalars; Query.count() wraps the full row select in a subquery
+    fraud_count = (await db.execute(select(func.count()).select_from(FraudLog))).scalar()
+    otp_sent = (await db.execute(select(func.count()).select_from(OTPLog))).scalar()
+    tx_count = (await db.execute(select(func.count()).select_from(Transaction))).scalar()
     return {"transactions": tx_count, "frauds": fraud_count, "otp_logs": otp_sent}
 
 @router.get("/fraud-logs")
-def get_fraud_logs(db: Session = Depends(get_db)):
-    logs = db.query(FraudLog).order_by(FraudLog.ts.desc()).limit(100).all()
+async def get_fraud_logs(db: AsyncSession = Depends(get_db)):
+    logs = (await db.execute(
+        select(FraudLog)
+        .order_by(FraudLog.ts.desc())
+        .limit(100)
+    )).scalars().all()
     return [
         {
             "id": l.id,
@@ -22,7 +28,7 @@ def get_fraud_logs(db: Session = Depends(get_db)):
             "risk_score": l.risk_score,
             "level": l.level,
             "reason": l.reason,
-            "ts": l.ts.isoformat(),
+            "ts_ms": epoch_ms(l.ts),
         }
         for l in logs
     ]
@@ -1,12 +1,15 @@
+import asyncio
+import secrets
+
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from datetime import timedelta
 from ..database.redis_client import get_redis
 from ..database.db import get_db
 from ..database.models import User, OTPLog
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .utils import create_access_token
-import random
 
 router = APIRouter()
 
@@ -25,38 +28,47 @@ class TokenResponse(BaseModel):
     role: str
 
 @router.post("/send-otp")
-def send_otp(payload: SendOTPRequest, db: Session = Depends(get_db)):
+async def send_otp(payload: SendOTPRequest, db: AsyncSession = Depends(get_db)):
     r = get_redis()
-    otp = f"{random.randint(100000, 999999)}"
+    otp = f"{secrets.randbelow(900000) + 100000:06d}"
     key = f"otp:{payload.mobile}:{payload.email or ''}"
-    r.setex(key, 300, otp)
     log = OTPLog(mobile=payload.mobile, email=payload.email, otp=otp)
     db.add(log)
-    db.commit()
+    # the Redis write and the DB commit are independent, so overlap their round-trips
+    await asyncio.gather(r.set(key, otp, ex=300), db.commit())
     # In production, send via SMS/Email provider
     return {"message": "OTP sent", "otp_debug": otp}
 
 @router.post("/verify-otp", response_model=TokenResponse)
-def verify_otp(payload: VerifyOTPRequest, db: Session = Depends(get_db)):
+async def verify_otp(payload: VerifyOTPRequest, db: AsyncSession = Depends(get_db)):
     r = get_redis()
     key = f"otp:{payload.mobile}:{payload.email or ''}"
-    otp_val = r.get(key)
+    # read and consume the OTP in one round-trip (MULTI/EXEC), so each OTP gets a single attempt;
+    # the user lookup runs concurrently with it
+    pipe = r.pipeline()
+    pipe.get(key)
+    pipe.delete(key)
+    (otp_val, _), user_res = await asyncio.gather(
+        pipe.execute(),
+        db.execute(select(User).where(User.mobile == payload.mobile)),
+    )
     if not otp_val or otp_val.decode() != payload.otp:
         raise HTTPException(status_code=400, detail="Invalid or expired OTP")
-    r.delete(key)
 
-    user = db.query(User).filter(User.mobile == payload.mobile).first()
+    user = user_res.scalars().first()
     if not user:
         user = User(name=f"User-{payload.mobile}", mobile=payload.mobile, email=payload.email, role="USER")
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
     token = create_access_token({"sub": str(user.id), "role": user.role}, expires_delta=timedelta(hours=2))
 
-    log = db.query(OTPLog).filter(OTPLog.mobile == payload.mobile, OTPLog.otp == payload.otp).first()
+    log = (await db.execute(
+        select(OTPLog).where(OTPLog.mobile == payload.mobile, OTPLog.otp == payload.otp).limit(1)
+    )).scalars().first()
     if log:
         log.verified = True
-        db.commit()
+        await db.commit()
 
     return TokenResponse(access_token=token, role=user.role)
@@ -1,8 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from datetime import datetime, timedelta
 from .db import Base
 
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+
+
+def epoch_ms(ts: datetime) -> int:
+    """Milliseconds since the Unix epoch for a naive UTC `ts` column value (what the frontend's `new Date(ms)` takes)."""
+    return (ts - EPOCH) // MILLISECOND
+
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -44,6 +53,11 @@ class Transaction(Base):
     user = relationship("User", back_populates="transactions")
     merchant = relationship("Merchant", back_populates="transactions")
 
+    __table_args__ = (
+        Index("ix_tx_user_ts", user_id, ts.desc()),
+        Index("ix_tx_merchant_ts", merchant_id, ts.desc()),
+    )
+
 class OTPLog(Base):
     __tablename__ = "otp_logs"
     id = Column(Integer, primary_key=True, index=True)
@@ -53,6 +67,8 @@ class OTPLog(Base):
     ts = Column(DateTime, default=datetime.utcnow)
     verified = Column(Boolean, default=False)
 
+    __table_args__ = (Index("ix_otp_mobile_otp", mobile, otp),)
+
 class FraudLog(Base):
     __tablename__ = "fraud_logs"
     id = Column(Integer, primary_key=True, index=True)
@@ -61,3 +77,5 @@ class FraudLog(Base):
     level = Column(String)
     reason = Column(String)
     ts = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_fraudlog_ts", ts.desc()),)
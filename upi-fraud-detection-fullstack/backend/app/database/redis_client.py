@@ -1,5 +1,5 @@
 import os
-import redis
+import redis.asyncio as redis
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
@@ -8,5 +8,6 @@ _redis = None
 def get_redis():
     global _redis
     if _redis is None:
-        _redis = redis.Redis.from_url(REDIS_URL)
+        pool = redis.ConnectionPool.from_url(REDIS_URL, max_connections=64, health_check_interval=30)
+        _redis = redis.Redis(connection_pool=pool)
     return _redis
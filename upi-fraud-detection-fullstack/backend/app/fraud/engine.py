@@ -1,10 +1,14 @@
-from typing import Dict
+from typing import Dict, List
 
+import numpy as np
+
+# Each rule is a list of conditions that must all hold, plus its weight and reason.
+# A condition is (field, op, value); ">" compares numbers, "==" matches a string value.
 RULES = [
-    (lambda tx: tx.get("amount", 0) > 50000, 0.9, "High amount > 50k"),
-    (lambda tx: tx.get("channel") == "QR" and tx.get("amount", 0) > 10000, 0.7, "QR high amount"),
-    (lambda tx: tx.get("merchant_category") == "UNKNOWN", 0.6, "Unknown merchant category"),
-    (lambda tx: tx.get("user_tx_last_hour", 0) > 20, 0.8, "Burst transactions"),
+    ([("amount", ">", 50000)], 0.9, "High amount > 50k"),
+    ([("channel", "==", "QR"), ("amount", ">", 10000)], 0.7, "QR high amount"),
+    ([("merchant_category", "==", "UNKNOWN")], 0.6, "Unknown merchant category"),
+    ([("user_tx_last_hour", ">", 20)], 0.8, "Burst transactions"),
 ]
 
 FEATURES = [
@@ -18,10 +22,57 @@ FEATURES = [
 ]
 
 
+def _compile_rules(rules):
+    """Flatten RULES into struct-of-arrays form: one "value > threshold" test per condition, rules contiguous."""
+    conditions, thresholds, starts = [], [], []
+    for conds, _, _ in rules:
+        starts.append(len(conditions))
+        for field, op, value in conds:
+            # string equality is packed as a 0/1 indicator, so it is also a ">" test (indicator > 0.5)
+            conditions.append((field, value) if op == "==" else (field, None))
+            thresholds.append(float(value) if op == ">" else 0.5)
+    return (
+        conditions,
+        np.array(thresholds, dtype=np.float64),
+        np.array(starts, dtype=np.intp),
+        np.array([w for _, w, _ in rules], dtype=np.float64),
+    )
+
+
+RULE_CONDITIONS, RULE_THRESHOLDS, RULE_STARTS, RULE_WEIGHTS = _compile_rules(RULES)
+
+
+def encode(txs: List[Dict]) -> np.ndarray:
+    """Pack transactions into an (n_tx, n_conditions) matrix, column k holding the value condition k tests."""
+    X = np.empty((len(txs), len(RULE_CONDITIONS)), dtype=np.float64)
+    for k, (field, value) in enumerate(RULE_CONDITIONS):
+        if value is None:
+            X[:, k] = [tx.get(field) or 0 for tx in txs]
+        else:
+            X[:, k] = [tx.get(field) == value for tx in txs]
+    return X
+
+
+def rule_score_vec(X: np.ndarray) -> np.ndarray:
+    """Score every row of X; a rule adds its weight when all of its conditions hold, total clipped to 1."""
+    # one compare for every condition, AND-reduced per rule, then a single mat-vec with the weights
+    fired = np.logical_and.reduceat(X > RULE_THRESHOLDS, RULE_STARTS, axis=1)
+    return np.minimum(fired @ RULE_WEIGHTS, 1.0)
+
+
+def rule_scores(txs: List[Dict]) -> np.ndarray:
+    """Batch scoring; for a single transaction use rule_score, numpy's per-call overhead only pays off on batches."""
+    return rule_score_vec(encode(txs))
+
+
 def rule_score(tx: Dict) -> float:
+    # plain loop over RULES: same semantics as rule_score_vec (missing/None numbers count as 0) at scalar speed
     score = 0.0
-    for pred, weight, _ in RULES:
-        if pred(tx):
+    for conds, weight, _ in RULES:
+        for field, op, value in conds:
+            if not ((tx.get(field) or 0) > value if op == ">" else tx.get(field) == value):
+                break
+        else:
             score += weight
     return min(score, 1.0)
 
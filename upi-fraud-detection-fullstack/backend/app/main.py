@@ -40,12 +40,12 @@ app.add_middleware(
 )
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     logger.add("app.log", rotation="1 MB")
-    init_db()
+    await init_db()
     try:
         r = get_redis()
-        r.ping()
+        await r.ping()
         logger.info("Redis connection OK")
     except Exception as e:
         logger.error(f"Redis connection failed: {e}")
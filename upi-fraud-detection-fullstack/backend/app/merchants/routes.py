@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database.db import get_db
-from ..database.models import Merchant, Transaction
+from ..database.models import Merchant, Transaction, epoch_ms
 
 router = APIRouter()
 
@@ -12,31 +13,37 @@ class MerchantCreate(BaseModel):
     category: str | None = "GENERAL"
 
 @router.get("/")
-def list_merchants(db: Session = Depends(get_db)):
-    return [
-        {"id": m.id, "name": m.name, "upi_id": m.upi_id, "category": m.category}
-        for m in db.query(Merchant).all()
-    ]
+async def list_merchants(limit: int = Query(50, ge=1, le=500), cursor: int | None = None, db: AsyncSession = Depends(get_db)):
+    # keyset page: pass the last id seen as `cursor` to get the next page
+    rows = (await db.execute(
+        select(Merchant.id, Merchant.name, Merchant.upi_id, Merchant.category)
+        .where(Merchant.id > (cursor or 0))
+        .order_by(Merchant.id)
+        .limit(limit)
+    )).all()
+    return [dict(r._mapping) for r in rows]
 
 @router.post("/")
-def create_merchant(payload: MerchantCreate, db: Session = Depends(get_db)):
+async def create_merchant(payload: MerchantCreate, db: AsyncSession = Depends(get_db)):
     m = Merchant(name=payload.name, upi_id=payload.upi_id, category=payload.category)
     db.add(m)
-    db.commit()
-    db.refresh(m)
+    await db.commit()
+    await db.refresh(m)
     return {"id": m.id}
 
 @router.get("/{merchant_id}/transactions")
-def merchant_transactions(merchant_id: int, db: Session = Depends(get_db)):
-    txs = db.query(Transaction).filter(Transaction.merchant_id == merchant_id).all()
+async def merchant_transactions(merchant_id: int, limit: int = Query(50, ge=1, le=500), cursor: int | None = None, db: AsyncSession = Depends(get_db)):
+    # newest first on the (merchant_id, ts desc) index; `cursor` is the last transaction id seen
+    q = (
+        select(Transaction.id, Transaction.amount, Transaction.ts, Transaction.user_id, Transaction.risk_score, Transaction.is_fraud)
+        .where(Transaction.merchant_id == merchant_id)
+        .order_by(Transaction.ts.desc(), Transaction.id.desc())
+        .limit(limit)
+    )
+    if cursor is not None:
+        cursor_ts = select(Transaction.ts).where(Transaction.id == cursor).scalar_subquery()
+        q = q.where(tuple_(Transaction.ts, Transaction.id) < tuple_(cursor_ts, cursor))
     return [
-        {
-            "id": t.id,
-            "amount": t.amount,
-            "ts": t.ts.isoformat(),
-            "user_id": t.user_id,
-            "risk_score": t.risk_score,
-            "is_fraud": t.is_fraud,
-        }
-        for t in txs
+        {"id": r.id, "amount": r.amount, "ts_ms": epoch_ms(r.ts), "user_id": r.user_id, "risk_score": r.risk_score, "is_fraud": r.is_fraud}
+        for r in (await db.execute(q)).all()
     ]
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database.db import get_db
-from ..database.models import User, Transaction
+from ..database.models import User, Transaction, epoch_ms
 
 router = APIRouter()
 
@@ -11,42 +12,48 @@ class UserUpdate(BaseModel):
     email: str | None = None
 
 @router.get("/")
-def list_users(db: Session = Depends(get_db)):
-    return [
-        {"id": u.id, "name": u.name, "mobile": u.mobile, "email": u.email, "role": u.role}
-        for u in db.query(User).all()
-    ]
+async def list_users(limit: int = Query(50, ge=1, le=500), cursor: int | None = None, db: AsyncSession = Depends(get_db)):
+    # keyset page: pass the last id seen as `cursor` to get the next page
+    rows = (await db.execute(
+        select(User.id, User.name, User.mobile, User.email, User.role)
+        .where(User.id > (cursor or 0))
+        .order_by(User.id)
+        .limit(limit)
+    )).all()
+    return [dict(r._mapping) for r in rows]
 
 @router.get("/{user_id}")
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    u = db.query(User).get(user_id)
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    u = await db.get(User, user_id)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
     return {"id": u.id, "name": u.name, "mobile": u.mobile, "email": u.email, "role": u.role}
 
 @router.put("/{user_id}")
-def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_db)):
-    u = db.query(User).get(user_id)
+async def update_user(user_id: int, payload: UserUpdate, db: AsyncSession = Depends(get_db)):
+    u = await db.get(User, user_id)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
     if payload.name:
         u.name = payload.name
     if payload.email:
         u.email = payload.email
-    db.commit()
+    await db.commit()
     return {"message": "updated"}
 
 @router.get("/{user_id}/transactions")
-def user_transactions(user_id: int, db: Session = Depends(get_db)):
-    txs = db.query(Transaction).filter(Transaction.user_id == user_id).all()
+async def user_transactions(user_id: int, limit: int = Query(50, ge=1, le=500), cursor: int | None = None, db: AsyncSession = Depends(get_db)):
+    # newest first on the (user_id, ts desc) index; `cursor` is the last transaction id seen
+    q = (
+        select(Transaction.id, Transaction.amount, Transaction.ts, Transaction.merchant_id, Transaction.risk_score, Transaction.is_fraud)
+        .where(Transaction.user_id == user_id)
+        .order_by(Transaction.ts.desc(), Transaction.id.desc())
+        .limit(limit)
+    )
+    if cursor is not None:
+        cursor_ts = select(Transaction.ts).where(Transaction.id == cursor).scalar_subquery()
+        q = q.where(tuple_(Transaction.ts, Transaction.id) < tuple_(cursor_ts, cursor))
     return [
-        {
-            "id": t.id,
-            "amount": t.amount,
-            "ts": t.ts.isoformat(),
-            "merchant_id": t.merchant_id,
-            "risk_score": t.risk_score,
-            "is_fraud": t.is_fraud,
-        }
-        for t in txs
+        {"id": r.id, "amount": r.amount, "ts_ms": epoch_ms(r.ts), "merchant_id": r.merchant_id, "risk_score": r.risk_score, "is_fraud": r.is_fraud}
+        for r in (await db.execute(q)).all()
     ]
@@ -1,14 +1,20 @@
+import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 
-client = TestClient(app)
 
-def test_health():
+@pytest.fixture(scope="module")
+def client():
+    # one client (and one event loop) for the module so the async DB/Redis pools stay on a single loop
+    with TestClient(app) as c:
+        yield c
+
+def test_health(client):
     r = client.get('/health')
     assert r.status_code == 200
     assert r.json()['status'] == 'ok'
 
-def test_send_verify_otp_flow(monkeypatch):
+def test_send_verify_otp_flow(client, monkeypatch):
     # Replace Redis with local dict via monkeypatch if needed; here use actual route
     mobile = '9999999999'
     r = client.post('/auth/send-otp', json={'mobile': mobile})
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+from app.fraud.engine import rule_score, rule_scores
+
+# the original per-rule predicates, with missing/None numbers read as 0
+REFERENCE_RULES = [
+    (lambda tx: (tx.get("amount") or 0) > 50000, 0.9),
+    (lambda tx: tx.get("channel") == "QR" and (tx.get("amount") or 0) > 10000, 0.7),
+    (lambda tx: tx.get("merchant_category") == "UNKNOWN", 0.6),
+    (lambda tx: (tx.get("user_tx_last_hour") or 0) > 20, 0.8),
+]
+
+
+def reference_score(tx):
+    return min(sum(w for pred, w in REFERENCE_RULES if pred(tx)), 1.0)
+
+
+@pytest.mark.parametrize("tx, expected", [
+    ({"channel": "QR", "amount": 10001}, 0.7),
+    ({"channel": "QR", "amount": 10000}, 0.0),  # threshold is strict
+    ({"channel": "UPI", "amount": 20000}, 0.0),  # amount alone does not fire the QR rule
+    ({"channel": "QR"}, 0.0),
+    ({"amount": 20000}, 0.0),
+    ({"channel": "QR", "amount": 60000}, 1.0),  # 0.9 + 0.7 clipped
+    ({"merchant_category": "UNKNOWN", "user_tx_last_hour": 21}, 1.0),
+    ({"user_tx_last_hour": 20}, 0.0),
+    ({}, 0.0),
+    ({"amount": None, "channel": None, "merchant_category": None, "user_tx_last_hour": None}, 0.0),
+    ({"amount": 50000.01}, 0.9),
+])
+def test_rule_score_cases(tx, expected):
+    assert rule_score(tx) == pytest.approx(expected)
+    assert rule_scores([tx])[0] == pytest.approx(expected)
+
+
+def test_rule_scores_match_reference():
+    rng = random.Random(0)
+    fields = {
+        "amount": [None, 0, 10000, 10000.01, 50000, 50000.01, 75000],
+        "channel": [None, "QR", "UPI", "CARD"],
+        "merchant_category": [None, "UNKNOWN", "FOOD"],
+        "user_tx_last_hour": [None, 0, 20, 21, 50],
+    }
+    txs = []
+    for _ in range(5000):
+        # drop some keys entirely to cover missing fields as well as explicit None
+        txs.append({k: rng.choice(v) for k, v in fields.items() if rng.random() > 0.1})
+    batch = rule_scores(txs)
+    for tx, b in zip(txs, batch):
+        assert rule_score(tx) == pytest.approx(reference_score(tx))
+        assert b == pytest.approx(reference_score(tx))
+
+
+def test_rule_scores_empty():
+    assert rule_scores([]).shape == (0,)
@@ -31,7 +31,7 @@ export default function AdminPanel(){
         {logs.map(l=>(
           <div key={l.id} className="border-b py-2 text-sm">
             <div>Tx #{l.transaction_id} • Score {l.risk_score.toFixed(2)} • {l.level}</div>
-            <div className="text-gray-500">{l.reason} • {new Date(l.ts).toLocaleString()}</div>
+            <div className="text-gray-500">{l.reason} • {new Date(l.ts_ms).toLocaleString()}</div>
           </div>
         ))}
         {logs.length===0 && <p className="text-gray-500">No logs yet.</p>}
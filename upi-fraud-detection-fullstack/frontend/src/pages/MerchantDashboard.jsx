@@ -1,6 +1,8 @@
 import React, { useEffect, useState } from 'react'
 import api from '../api'
 
+const PAGE_SIZE = 50
+
 function QR({ upiId }){
   const data = `upi://pay?pa=${upiId}&pn=Merchant&am=1&cu=INR`
   return (
@@ -15,6 +17,14 @@ function QR({ upiId }){
 export default function MerchantDashboard(){
   const [merchant, setMerchant] = useState(null)
   const [txs, setTxs] = useState([])
+  const [hasMore, setHasMore] = useState(false)
+
+  // keyset pages: pass the last transaction id seen as the cursor; a short page means there is nothing older
+  const loadTxs = (id, cursor) =>
+    api.get(`/merchants/${id}/transactions`, { params: { limit: PAGE_SIZE, cursor } }).then(t=>{
+      setTxs(prev => cursor === undefined ? t.data : [...prev, ...t.data])
+      setHasMore(t.data.length === PAGE_SIZE)
+    })
 
   useEffect(()=>{
     const role = localStorage.getItem('role')
@@ -23,7 +33,7 @@ export default function MerchantDashboard(){
       const m = r.data[0]
       if (m) {
         setMerchant(m)
-        api.get(`/merchants/${m.id}/transactions`).then(t=>setTxs(t.data))
+        loadTxs(m.id)
       }
     })
   },[])
@@ -37,11 +47,12 @@ export default function MerchantDashboard(){
         <h3 className="font-semibold mb-2">Transactions</h3>
         {txs.map(t=>(
           <div key={t.id} className="border-b py-2 text-sm flex justify-between">
-            <span>₹{t.amount} • {new Date(t.ts).toLocaleString()}</span>
+            <span>₹{t.amount} • {new Date(t.ts_ms).toLocaleString()}</span>
             <span>Risk: {t.risk_score.toFixed(2)} {t.is_fraud? '⚠️':''}</span>
           </div>
         ))}
         {txs.length===0 && <p className="text-gray-500">No transactions yet.</p>}
+        {hasMore && <button className="button mt-2" onClick={()=>loadTxs(merchant.id, txs[txs.length-1].id)}>Load more</button>}
       </div>
     </div>
   )
@@ -1,9 +1,19 @@
 import React, { useEffect, useState } from 'react'
 import api from '../api'
 
+const PAGE_SIZE = 50
+
 export default function UserDashboard(){
   const [user, setUser] = useState(null)
   const [txs, setTxs] = useState([])
+  const [hasMore, setHasMore] = useState(false)
+
+  // keyset pages: pass the last transaction id seen as the cursor; a short page means there is nothing older
+  const loadTxs = (id, cursor) =>
+    api.get(`/users/${id}/transactions`, { params: { limit: PAGE_SIZE, cursor } }).then(t=>{
+      setTxs(prev => cursor === undefined ? t.data : [...prev, ...t.data])
+      setHasMore(t.data.length === PAGE_SIZE)
+    })
 
   useEffect(()=>{
     const role = localStorage.getItem('role')
@@ -12,7 +22,7 @@ export default function UserDashboard(){
       const me = r.data.find(u=>u.role==='USER')
       if (me) {
         setUser(me)
-        api.get(`/users/${me.id}/transactions`).then(t=>setTxs(t.data))
+        loadTxs(me.id)
       }
     })
   },[])
@@ -25,11 +35,12 @@ export default function UserDashboard(){
         <h3 className="font-semibold mb-2">Transaction History</h3>
         {txs.map(t=>(
           <div key={t.id} className="border-b py-2 text-sm flex justify-between">
-            <span>₹{t.amount} • {new Date(t.ts).toLocaleString()}</span>
+            <span>₹{t.amount} • {new Date(t.ts_ms).toLocaleString()}</span>
             <span>Risk: {t.risk_score.toFixed(2)} {t.is_fraud? '⚠️':''}</span>
           </div>
         ))}
         {txs.length===0 && <p className="text-gray-500">No transactions yet.</p>}
+        {hasMore && <button className="button mt-2" onClick={()=>loadTxs(user.id, txs[txs.length-1].id)}>Load more</button>}
       </div>
     </div>
   )
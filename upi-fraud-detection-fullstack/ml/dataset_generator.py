@@ -9,16 +9,25 @@ def generate(n: int = 10000, seed: int = 42) -> pd.DataFrame:
     user_ids = rng.integers(1, 1000, size=n)
     merchant_ids = rng.integers(1, 200, size=n)
     amounts = rng.gamma(2.0, 500.0, size=n).clip(1, 100000)
-    channel = rng.choice(CHANNELS, size=n, p=[0.7,0.2,0.1])
-    category = rng.choice(CATEGORIES, size=n, p=[0.4,0.2,0.2,0.15,0.05])
+    # draw integer codes (same random stream as choosing the labels directly) so the fraud masks
+    # below compare small ints instead of fixed-width unicode strings
+    channel_code = rng.choice(len(CHANNELS), size=n, p=[0.7,0.2,0.1])
+    category_code = rng.choice(len(CATEGORIES), size=n, p=[0.4,0.2,0.2,0.15,0.05])
+    channel = np.array(CHANNELS)[channel_code]
+    category = np.array(CATEGORIES)[category_code]
     hour = rng.integers(0,24,size=n)
     dow = rng.integers(0,7,size=n)
     user_burst = rng.poisson(2, size=n)
     merchant_burst = rng.poisson(5, size=n)
 
     # Hidden fraud pattern
-    fraud_prob = 0.02 + (amounts>50000)*0.3 + (channel=='QR')*(amounts>10000)*0.2 + (category=='UNKNOWN')*0.15 + (user_burst>20)*0.3
-    fraud = rng.random(size=n) < np.clip(fraud_prob, 0, 0.95)
+    # accumulated in place into one buffer, in the same order as the plain sum
+    fraud_prob = (amounts>50000)*0.3
+    fraud_prob += 0.02
+    fraud_prob += ((channel_code==CHANNELS.index('QR')) & (amounts>10000))*0.2
+    fraud_prob += (category_code==CATEGORIES.index('UNKNOWN'))*0.15
+    fraud_prob += (user_burst>20)*0.3
+    fraud = rng.random(size=n) < np.minimum(fraud_prob, 0.95, out=fraud_prob)
 
     df = pd.DataFrame({
         'user_id': user_ids,
@@ -1,13 +1,18 @@
+import numpy as np
 import pandas as pd
 
+CHANNELS = ['UPI','QR','LINK']
+
 def featurize(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
-    df['channel_UPI'] = (df['channel']=='UPI').astype(int)
-    df['channel_QR'] = (df['channel']=='QR').astype(int)
-    df['channel_LINK'] = (df['channel']=='LINK').astype(int)
-    df['cat_UNKNOWN'] = (df['merchant_category']=='UNKNOWN').astype(int)
-    df['hour_sin'] = (df['hour']/24*2*3.14159).apply(lambda x: __import__('math').sin(x))
-    df['hour_cos'] = (df['hour']/24*2*3.14159).apply(lambda x: __import__('math').cos(x))
+    # one comparison pass per channel over the raw array instead of a pandas op per column
+    onehot = np.equal.outer(df['channel'].to_numpy(), CHANNELS).astype(np.int8)
+    for i, ch in enumerate(CHANNELS):
+        df[f'channel_{ch}'] = onehot[:, i]
+    df['cat_UNKNOWN'] = (df['merchant_category'].to_numpy()=='UNKNOWN').astype(np.int8)
+    h = df['hour'].to_numpy() * (2*np.pi/24)
+    df['hour_sin'] = np.sin(h)
+    df['hour_cos'] = np.cos(h)
     cols = ['amount','day_of_week','user_tx_last_hour','merchant_tx_last_hour','channel_UPI','channel_QR','channel_LINK','cat_UNKNOWN','hour_sin','hour_cos']
     return df[cols]
 
@@ -53,3 +53,9 @@ CREATE TABLE IF NOT EXISTS fraud_logs (
   reason TEXT,
   ts TIMESTAMP DEFAULT NOW()
 );
+
+-- composite / ordering indexes for the hot lookups
+CREATE INDEX IF NOT EXISTS ix_tx_user_ts ON transactions (user_id, ts DESC);
+CREATE INDEX IF NOT EXISTS ix_tx_merchant_ts ON transactions (merchant_id, ts DESC);
+CREATE INDEX IF NOT EXISTS ix_otp_mobile_otp ON otp_logs (mobile, otp);
+CREATE INDEX IF NOT EXISTS ix_fraudlog_ts ON fraud_logs (ts DESC);
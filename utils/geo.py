@@ -0,0 +1,27 @@
+"""
+Geo helpers shared by the data generator, feature engineering and the API.
+"""
+import math
+
+from numba import njit, vectorize
+
+
+@njit(fastmath=True, cache=True)
+def haversine_km_scalar(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometers for one pair of points; the fast path for single-row callers."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    s_dphi = math.sin(math.radians(lat2 - lat1) * 0.5)
+    s_dlambda = math.sin(math.radians(lon2 - lon1) * 0.5)
+    a = s_dphi * s_dphi + math.cos(phi1) * math.cos(phi2) * s_dlambda * s_dlambda
+    return 2.0 * 6371.0 * math.asin(math.sqrt(a))
+
+
+@vectorize(['float64(float64, float64, float64, float64)', 'float32(float32, float32, float32, float32)'],
+           fastmath=True, target='parallel', cache=True)
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometers as a multithreaded ufunc over arrays.
+
+    Scalars work too, but the parallel dispatch costs a few microseconds per call; use haversine_km_scalar.
+    """
+    return haversine_km_scalar(lat1, lon1, lat2, lon2)